@@ -1,11 +1,18 @@
 """Manage configurations and perform auto-completion."""
 
+from array import array
 from io import StringIO
 import ast
+import bisect
 import configparser
+import contextlib
+import copy
+import functools
 import os
+import re
+import shutil
 import sys
-import time
+import tempfile
 
 from prompt_toolkit import ANSI
 from prompt_toolkit import prompt as pt_prompt
@@ -17,13 +24,6 @@ try:
 except ModuleNotFoundError as e:
     GNUPG_IMPORT_ERROR = e
 
-try:
-    import pyautogui
-    import win32api
-    GUI_IMPORT_ERROR = None
-except ModuleNotFoundError as e:
-    GUI_IMPORT_ERROR = e
-
 import file_utilities
 
 ANSI_BOLD = '\033[1m'
@@ -34,6 +34,43 @@ ANSI_RESET = '\033[m'
 ANSI_UNDERLINE = '\033[4m'
 ANSI_WARNING = '\033[33m'
 INDENT = '    '
+MAXIMUM_HINTED_VALUES = 4
+INTEGER_PATTERN = re.compile(r'-?(?:0|[1-9][0-9]*)')
+NAMED_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+CURRENT_LINE = f'%s{ANSI_CURRENT}%s{ANSI_RESET}'
+DIFFERENCE_LINE = f'{ANSI_IDENTIFIER}%s{ANSI_RESET}: %s → %s'
+EMPTY_VALUE = f'{ANSI_WARNING}(empty){ANSI_RESET}'
+KEY_VALUE_LINE = (f'%s{ANSI_IDENTIFIER}%s{ANSI_RESET}: '
+                  f'{ANSI_CURRENT}%s{ANSI_RESET}')
+NONEXISTENT_VALUE = f'{ANSI_WARNING}(not exist){ANSI_RESET}'
+OPTION_LINE = f'{ANSI_IDENTIFIER}%s{ANSI_RESET} = {ANSI_CURRENT}%s{ANSI_RESET}'
+SECTION_LINE = f'[{ANSI_BOLD}%s{ANSI_RESET}]'
+WARNING_LINE = f'%s{ANSI_WARNING}%s{ANSI_RESET}'
+
+END_ANSWERS = ('insert', 'back', 'quit')
+FIRST_END_ANSWERS = ('insert', 'quit')
+ITEM_ANSWERS = ('insert', 'modify', 'delete', 'back', 'quit')
+FIRST_ITEM_ANSWERS = ('insert', 'modify', 'delete', 'quit')
+NESTING_ANSWERS = ('build', 'call')
+RESET_ANSWERS = ('default', 'back', 'quit')
+FIRST_RESET_ANSWERS = ('default', 'quit')
+VALUE_ANSWERS = ('modify', 'empty', 'back', 'quit')
+FIRST_VALUE_ANSWERS = ('modify', 'empty', 'quit')
+OPTION_ANSWERS = {
+    (can_toggle, can_back, can_insert_delete): (
+        ('modify',) + (('toggle',) if can_toggle else ())
+        + (('delete',) if can_insert_delete else ('default',))
+        + (('back',) if can_back else ()) + ('quit',))
+    for can_toggle in (False, True)
+    for can_back in (False, True)
+    for can_insert_delete in (False, True)}
+
+_gpg = None
+_default_fingerprint = ''
+_pending_backups = {}
+_pending_configs = {}
+_write_deferral_depth = 0
 
 if sys.platform == 'win32':
     os.system('color')
@@ -46,21 +83,50 @@ class CustomWordCompleter(Completer):
         """Initialize with words for auto-completion."""
         self.words = words
         self.ignore_case = ignore_case
+        self._sorted_words = sorted(
+            ((word.lower() if ignore_case else word, word) for word in words),
+            key=lambda pair: pair[0])
+        self._comparable_words = [pair[0] for pair in self._sorted_words]
 
     def get_completions(self, document, complete_event):
         """Yield completions for the current word before the cursor."""
         word_before_cursor = document.current_line_before_cursor.lstrip()
-        for word in self.words:
-            if self.ignore_case:
-                if word.lower().startswith(word_before_cursor.lower()):
-                    yield Completion(word, -len(word_before_cursor))
-            else:
-                if word.startswith(word_before_cursor):
-                    yield Completion(word, -len(word_before_cursor))
+        prefix = (word_before_cursor.lower() if self.ignore_case
+                  else word_before_cursor)
+        start_position = -len(word_before_cursor)
+        if not prefix:
+            for word in self.words:
+                yield Completion(word, start_position)
+            return
+
+        index = bisect.bisect_left(self._comparable_words, prefix)
+        while (index < len(self._comparable_words)
+               and self._comparable_words[index].startswith(prefix)):
+            yield Completion(self._sorted_words[index][1], start_position)
+            index += 1
+
+
+def import_gui_modules():
+    """Import GUI modules on first use and return the import error, if any."""
+    global pyautogui, GUI_IMPORT_ERROR
+    if 'GUI_IMPORT_ERROR' not in globals():
+        try:
+            import pyautogui
+            GUI_IMPORT_ERROR = None
+        except ModuleNotFoundError as e:
+            GUI_IMPORT_ERROR = e
+    return GUI_IMPORT_ERROR
 
 
 def read_config(config, config_path, is_encrypted=False):
     """Read config from a file, decrypt if is_encrypted is True."""
+    data = read_config_data(config_path, is_encrypted=is_encrypted)
+    if data is not None:
+        config.read_string(data.decode('utf-8'), source=config_path)
+
+
+def read_config_data(config_path, is_encrypted=False):
+    """Read the plaintext bytes of a config file, or None if it is missing."""
     if is_encrypted:
         encrypted_config_path = f'{config_path}.gpg'
         if os.path.isfile(encrypted_config_path):
@@ -68,13 +134,13 @@ def read_config(config, config_path, is_encrypted=False):
                 raise RuntimeError(GNUPG_IMPORT_ERROR)
 
             with open(encrypted_config_path, 'rb') as f:
-                encrypted_config = f.read()
+                decrypted_config = get_gpg().decrypt_file(f)
 
-            gpg = gnupg.GPG()
-            decrypted_config = gpg.decrypt(encrypted_config)
-            config.read_string(decrypted_config.data.decode())
-    else:
-        config.read(config_path, encoding='utf-8')
+            return decrypted_config.data
+    elif os.path.isfile(config_path):
+        with open(config_path, 'rb') as f:
+            return f.read()
+    return None
 
 
 def write_config(config, config_path, is_encrypted=False):
@@ -85,23 +151,101 @@ def write_config(config, config_path, is_encrypted=False):
 
         config_string = StringIO()
         config.write(config_string)
-        gpg = gnupg.GPG()
-        gpg.encoding = 'utf-8'
+        gpg = get_gpg()
         fingerprint = ''
         if config.has_option('General', 'fingerprint'):
             fingerprint = config['General']['fingerprint']
         if not fingerprint:
-            fingerprint = gpg.list_keys()[0]['fingerprint']
+            fingerprint = get_default_fingerprint()
 
-        encrypted_config = gpg.encrypt(config_string.getvalue(), fingerprint,
-                                       armor=False)
-        with open(f'{config_path}.gpg', 'wb') as f:
-            f.write(encrypted_config.data)
+        target_path = os.path.realpath(f'{config_path}.gpg')
     else:
-        with open(config_path, 'w', encoding='utf-8') as f:
-            config.write(f)
+        target_path = os.path.realpath(config_path)
 
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(target_path),
+                                     delete=False) as f:
+        temporary_path = f.name
 
+    try:
+        if is_encrypted:
+            encrypted_config = gpg.encrypt(
+                config_string.getvalue(), fingerprint, armor=False,
+                output=temporary_path)
+            if not encrypted_config.ok:
+                raise RuntimeError(encrypted_config.status)
+        else:
+            with open(temporary_path, 'w', encoding='utf-8') as f:
+                config.write(f)
+
+        if os.path.isfile(target_path):
+            shutil.copymode(target_path, temporary_path)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporary_path, 0o666 & ~umask)
+        os.replace(temporary_path, target_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary_path)
+        raise
+
+
+def get_gpg():
+    """Return a GPG instance shared across reads and writes."""
+    global _gpg
+    if _gpg is None:
+        _gpg = gnupg.GPG()
+        _gpg.encoding = 'utf-8'
+    return _gpg
+
+
+def get_default_fingerprint():
+    """Return the fingerprint of the first key in the keyring."""
+    global _default_fingerprint
+    if not _default_fingerprint:
+        _default_fingerprint = get_gpg().list_keys()[0]['fingerprint']
+    return _default_fingerprint
+
+
+def defer_writes(function):
+    """Defer config writes until the outermost decorated call returns."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global _write_deferral_depth
+        _write_deferral_depth += 1
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _write_deferral_depth -= 1
+            if not _write_deferral_depth:
+                flush_configs()
+                _pending_backups.clear()
+    return wrapper
+
+
+def request_backup(config_path, backup_parameters):
+    """Back up a config file before it is first written in a session."""
+    _pending_backups.setdefault(config_path, backup_parameters)
+
+
+def mark_config_dirty(config, config_path, is_encrypted=False):
+    """Mark config as modified so that it is written on the next flush."""
+    _pending_configs[config_path] = (copy.deepcopy(config), is_encrypted)
+    if not _write_deferral_depth:
+        flush_configs()
+
+
+def flush_configs():
+    """Write all configs that have been marked as modified."""
+    while _pending_configs:
+        config_path, (config, is_encrypted) = _pending_configs.popitem()
+        backup_parameters = _pending_backups.pop(config_path, None)
+        if backup_parameters:
+            file_utilities.backup_file(config_path, **backup_parameters)
+        write_config(config, config_path, is_encrypted=is_encrypted)
+
+
+@defer_writes
 def check_config_changes(default_config, config_path, excluded_sections=(),
                          user_option_ignored_sections=(),
                          backup_parameters=None, is_encrypted=False):
@@ -114,10 +258,10 @@ def check_config_changes(default_config, config_path, excluded_sections=(),
         return string
 
     if backup_parameters:
-        file_utilities.backup_file(config_path, **backup_parameters)
+        request_backup(config_path, backup_parameters)
 
     section_index = 0
-    section_indices = []
+    section_indices = array('i')
     sections = []
     for section in default_config.sections():
         if (section not in excluded_sections
@@ -125,7 +269,14 @@ def check_config_changes(default_config, config_path, excluded_sections=(),
             sections.append(section)
 
     user_config = configparser.ConfigParser(interpolation=None)
-    read_config(user_config, config_path, is_encrypted=is_encrypted)
+    user_data = read_config_data(config_path, is_encrypted=is_encrypted)
+    if user_data is not None:
+        user_string = user_data.decode('utf-8').replace('\r\n', '\n')
+        user_config.read_string(user_string, source=config_path)
+        default_config_string = StringIO()
+        default_config.write(default_config_string)
+        if default_config_string.getvalue() == user_string:
+            return
 
     while section_index < len(sections):
         section = sections[section_index]
@@ -134,49 +285,51 @@ def check_config_changes(default_config, config_path, excluded_sections=(),
         if not user_config.has_section(section):
             user_config.add_section(section)
 
+        default_section = dict(default_config.items(section))
+        user_section = dict(user_config.items(section))
+
         option_index = 0
-        option_indices = []
+        option_indices = array('i')
         options = default_config.options(section)
-        for option in user_config[section]:
-            if (section not in user_option_ignored_sections
-                and option not in default_config[section]):
-                options.append(option)
+        if section not in user_option_ignored_sections:
+            options.extend(option for option in user_section
+                           if option not in default_section)
 
         while option_index < len(options):
             option = options[option_index]
-            default_value = default_config[section].get(option)
-            user_value = user_config[section].get(option)
+            default_value = default_section.get(option)
+            user_value = user_section.get(option)
 
             if user_value is not None and default_value != user_value:
+                lines = []
                 if not option_indices:
-                    print(f'[{ANSI_BOLD}{section}{ANSI_RESET}]')
+                    lines.append(SECTION_LINE % section)
 
-                if default_config.has_option(section, option):
+                if option in default_section:
                     tidied_default_value = (
                         truncate_string(default_value)
-                        if default_value
-                        else f'{ANSI_WARNING}(empty){ANSI_RESET}')
+                        if default_value else EMPTY_VALUE)
                 else:
-                    tidied_default_value = (
-                        f'{ANSI_WARNING}(not exist){ANSI_RESET}')
+                    tidied_default_value = NONEXISTENT_VALUE
 
                 tidied_user_value = (
-                    f'{ANSI_CURRENT}{truncate_string(user_value)}{ANSI_RESET}'
-                    if user_value else f'{ANSI_WARNING}(empty){ANSI_RESET}')
-
-                print(f'{ANSI_IDENTIFIER}{option}{ANSI_RESET}: '
-                      f'{tidied_default_value} → {tidied_user_value}')
+                    CURRENT_LINE % ('', truncate_string(user_value))
+                    if user_value else EMPTY_VALUE)
 
-                answers = ['default', 'back', 'quit']
-                if not section_indices and not option_indices:
-                    answers.remove('back')
+                lines.append(DIFFERENCE_LINE
+                             % (option, tidied_default_value,
+                                tidied_user_value))
+                sys.stdout.write('\n'.join(lines) + '\n')
 
-                answer = tidy_answer(answers)
+                answer = tidy_answer(
+                    RESET_ANSWERS if section_indices or option_indices
+                    else FIRST_RESET_ANSWERS)
 
                 if answer == 'default':
                     user_config.remove_option(section, option)
-                    write_config(user_config, config_path,
-                                 is_encrypted=is_encrypted)
+                    user_section = dict(user_config.items(section))
+                    mark_config_dirty(user_config, config_path,
+                                      is_encrypted=is_encrypted)
                 elif answer == 'back':
                     if option_indices:
                         option_index = option_indices.pop()
@@ -210,22 +363,25 @@ def list_section(config, section):
     return False
 
 
+@defer_writes
 def modify_section(config, section, config_path, backup_parameters=None,
                    option=None, can_back=True, can_insert_delete=False,
                    prompts=None, items=None, all_values=None, limits=(),
                    is_encrypted=False):
     """Modify a section of a configuration based on user input."""
     if backup_parameters:
-        file_utilities.backup_file(config_path, **backup_parameters)
+        request_backup(config_path, backup_parameters)
 
     if config.has_section(section):
         index = 0
         options = [option] if option else config.options(section)
-        length = len(options) + 1 if can_insert_delete else len(options)
         if prompts is None:
             prompts = {}
 
-        while index < length:
+        end_of_list_prompt = prompts.get('end_of_list', 'end of section')
+        key_prompt = prompts.get('key', 'option')
+
+        while index < len(options) + can_insert_delete:
             if index < len(options):
                 option = options[index]
                 current_can_back = False if index == 0 else can_back
@@ -241,30 +397,29 @@ def modify_section(config, section, config_path, backup_parameters=None,
                     continue
                 elif result == 'quit':
                     return result
+                elif not config.has_option(section, option):
+                    del options[index]
+                    continue
             else:
-                print(f'{ANSI_WARNING}'
-                      f"{prompts.get('end_of_list', 'end of section')}"
-                      f'{ANSI_RESET}')
-                answer = tidy_answer(['insert', 'back', 'quit'])
+                print(WARNING_LINE % ('', end_of_list_prompt))
+                answer = tidy_answer(END_ANSWERS)
 
                 if answer == 'insert':
-                    option = modify_value(prompts.get('key', 'option'))
+                    option = modify_value(key_prompt)
                     if all_values:
                         config[section][option] = str(modify_tuple(
                             (), level=1, prompts=prompts,
                             all_values=all_values))
                         if config[section][option] != '()':
-                            write_config(config, config_path,
-                                         is_encrypted=is_encrypted)
+                            mark_config_dirty(config, config_path,
+                                              is_encrypted=is_encrypted)
                             options.append(option)
-                            length += 1
                     else:
                         config[section][option] = modify_value('value')
                         if config[section][option]:
-                            write_config(config, config_path,
-                                         is_encrypted=is_encrypted)
+                            mark_config_dirty(config, config_path,
+                                              is_encrypted=is_encrypted)
                             options.append(option)
-                            length += 1
                 elif answer == 'back':
                     index -= 1
                     continue
@@ -279,32 +434,29 @@ def modify_section(config, section, config_path, backup_parameters=None,
     return False
 
 
+@defer_writes
 def modify_option(config, section, option, config_path, backup_parameters=None,
                   can_back=False, can_insert_delete=False, initial_value=None,
                   prompts=None, items=None, all_values=None, limits=(),
                   is_encrypted=False):
     """Modify an option in a section of a configuration file."""
     if backup_parameters:
-        file_utilities.backup_file(config_path, **backup_parameters)
+        request_backup(config_path, backup_parameters)
     if initial_value:
         config[section].setdefault(option, initial_value)
     if prompts is None:
         prompts = {}
 
     if config.has_option(section, option):
-        print(f'{ANSI_IDENTIFIER}{option}{ANSI_RESET} = '
-              f'{ANSI_CURRENT}{config[section][option]}{ANSI_RESET}')
+        print(OPTION_LINE % (option, config[section][option]))
         try:
             boolean_value = get_strict_boolean(config, section, option)
-            answers = ['modify', 'toggle', 'default', 'quit']
+            can_toggle = True
         except ValueError:
-            answers = ['modify', 'default', 'quit']
-        if can_back:
-            answers.insert(answers.index('quit'), 'back')
-        if can_insert_delete:
-            answers[answers.index('default')] = 'delete'
+            can_toggle = False
 
-        answer = tidy_answer(answers)
+        answer = tidy_answer(OPTION_ANSWERS[
+            can_toggle, bool(can_back), bool(can_insert_delete)])
 
         if answer == 'modify':
             evaluated_value = evaluate_value(config[section][option])
@@ -353,22 +505,23 @@ def modify_option(config, section, option, config_path, backup_parameters=None,
                 return False
             return answer
 
-        write_config(config, config_path, is_encrypted=is_encrypted)
+        mark_config_dirty(config, config_path, is_encrypted=is_encrypted)
         return True
 
     print(option, 'option does not exist.')
     return False
 
 
+@defer_writes
 def delete_option(config, section, option, config_path,
                   backup_parameters=None, is_encrypted=False):
     """Delete an option from a section in a configuration file."""
     if backup_parameters:
-        file_utilities.backup_file(config_path, **backup_parameters)
+        request_backup(config_path, backup_parameters)
 
     if config.has_option(section, option):
         config.remove_option(section, option)
-        write_config(config, config_path, is_encrypted=is_encrypted)
+        mark_config_dirty(config, config_path, is_encrypted=is_encrypted)
         return True
 
     print(option, 'option does not exist.')
@@ -384,13 +537,9 @@ def modify_dictionary(dictionary, level=0, prompts=None, all_values=None):
     while index < len(keys):
         key = keys[index]
         value = dictionary[key]
-        print(f'{INDENT * level}{ANSI_IDENTIFIER}{key}{ANSI_RESET}: '
-              f'{ANSI_CURRENT}{value}{ANSI_RESET}')
-        answers = ['modify', 'empty', 'back', 'quit']
-        if index == 0:
-            answers.remove('back')
-
-        answer = tidy_answer(answers, level=level)
+        print(KEY_VALUE_LINE % (INDENT * level, key, value))
+        answer = tidy_answer(VALUE_ANSWERS if index else FIRST_VALUE_ANSWERS,
+                             level=level)
 
         if answer == 'modify':
             dictionary[key] = modify_value(value_prompt, level=level,
@@ -412,23 +561,20 @@ def modify_tuple(tuple_entry, level=0, prompts=None, all_values=None):
     """Modify a tuple based on user prompts and provided values."""
     tuple_entry = list(tuple_entry)
     values_prompt = prompts.get('values', ())
+    default_value_prompt = prompts.get('value', 'value')
+    end_of_list_prompt = prompts.get('end_of_list', 'end of tuple')
 
     index = 0
     while index <= len(tuple_entry):
         if index == len(tuple_entry):
-            print(f'{INDENT * level}'
-                  f"{ANSI_WARNING}{prompts.get('end_of_list', 'end of tuple')}"
-                  f'{ANSI_RESET}')
-            answers = ['insert', 'back', 'quit']
+            print(WARNING_LINE % (INDENT * level, end_of_list_prompt))
+            answers = END_ANSWERS if index else FIRST_END_ANSWERS
         else:
-            print(f'{INDENT * level}'
-                  f'{ANSI_CURRENT}{tuple_entry[index]}{ANSI_RESET}')
+            print(CURRENT_LINE % (INDENT * level, tuple_entry[index]))
             if values_prompt:
-                answers = ['modify', 'empty', 'back', 'quit']
+                answers = VALUE_ANSWERS if index else FIRST_VALUE_ANSWERS
             else:
-                answers = ['insert', 'modify', 'delete', 'back', 'quit']
-        if index == 0:
-            answers.remove('back')
+                answers = ITEM_ANSWERS if index else FIRST_ITEM_ANSWERS
 
         answer = tidy_answer(answers, level=level)
 
@@ -436,7 +582,7 @@ def modify_tuple(tuple_entry, level=0, prompts=None, all_values=None):
             value = '' if answer == 'insert' else tuple_entry[index]
             value_prompt = (values_prompt[index]
                             if values_prompt[index:index + 1]
-                            else prompts.get('value', 'value'))
+                            else default_value_prompt)
             if all_values and len(all_values) == 1:
                 value = modify_value(value_prompt, level=level, value=value,
                                      all_values=all_values[0])
@@ -474,23 +620,34 @@ def modify_tuple_list(tuple_list, level=0, prompts=None, items=None):
     if items is None:
         items = {}
 
+    key_prompt = prompts.get('key', 'key')
     value_prompt = prompts.get('value', 'value')
     additional_value_prompt = prompts.get('additional_value',
                                           'additional value')
+    preset_additional_value_prompt = prompts.get('preset_additional_value',
+                                                 'preset additional value')
+    end_of_list_prompt = prompts.get('end_of_list', 'end of list')
+
+    all_keys = items.get('all_keys')
+    no_value_keys = items.get('no_value_keys') or frozenset()
+    optional_value_keys = items.get('optional_value_keys') or frozenset()
+    additional_value_keys = items.get('additional_value_keys') or frozenset()
+    optional_additional_value_keys = (
+        items.get('optional_additional_value_keys') or frozenset())
+    positioning_keys = items.get('positioning_keys') or frozenset()
+    control_flow_keys = items.get('control_flow_keys') or frozenset()
+    preset_values_keys = items.get('preset_values_keys') or frozenset()
+    preset_values_item = items.get('preset_values')
+    preset_additional_values = items.get('preset_additional_values')
 
     index = 0
     while index <= len(tuple_list):
         if index == len(tuple_list):
-            print(f'{INDENT * level}'
-                  f"{ANSI_WARNING}{prompts.get('end_of_list', 'end of list')}"
-                  f'{ANSI_RESET}')
-            answers = ['insert', 'back', 'quit']
+            print(WARNING_LINE % (INDENT * level, end_of_list_prompt))
+            answers = END_ANSWERS if index else FIRST_END_ANSWERS
         else:
-            print(f'{INDENT * level}'
-                  f'{ANSI_CURRENT}{tuple_list[index]}{ANSI_RESET}')
-            answers = ['insert', 'modify', 'delete', 'back', 'quit']
-        if index == 0:
-            answers.remove('back')
+            print(CURRENT_LINE % (INDENT * level, tuple_list[index]))
+            answers = ITEM_ANSWERS if index else FIRST_ITEM_ANSWERS
 
         answer = tidy_answer(answers, level=level)
 
@@ -501,25 +658,24 @@ def modify_tuple_list(tuple_list, level=0, prompts=None, items=None):
                 key, value, additional_value = (
                     tuple_list[index] + ('', ''))[:3]
 
-            key = modify_value(prompts.get('key', 'key'), level=level,
-                               value=key, all_values=items.get('all_keys'))
-            preset_values = (
-                items.get('preset_values')
-                if key in items.get('preset_values_keys', set()) else None)
-            if key in items.get('no_value_keys', set()):
+            key = modify_value(key_prompt, level=level, value=key,
+                               all_values=all_keys)
+            preset_values = (preset_values_item
+                             if key in preset_values_keys else None)
+            if key in no_value_keys:
                 tuple_entry = (key,)
-            elif key in items.get('optional_value_keys', set()):
+            elif key in optional_value_keys:
                 value = modify_value(value_prompt, level=level, value=value,
                                      all_values=('None',))
                 tuple_entry = ((key,) if value.lower() in {'', 'none'}
                                else (key, value))
-            elif key in items.get('additional_value_keys', set()):
+            elif key in additional_value_keys:
                 value = modify_value(value_prompt, level=level, value=value)
                 additional_value = modify_value(additional_value_prompt,
                                                 level=level,
                                                 value=additional_value)
                 tuple_entry = (key, value, additional_value)
-            elif key in items.get('optional_additional_value_keys', set()):
+            elif key in optional_additional_value_keys:
                 value = modify_value(value_prompt, level=level, value=value)
                 additional_value = modify_value(
                     additional_value_prompt, level=level,
@@ -527,13 +683,13 @@ def modify_tuple_list(tuple_list, level=0, prompts=None, items=None):
                 tuple_entry = (
                     (key, value) if additional_value.lower() in {'', 'none'}
                     else (key, value, additional_value))
-            elif key in items.get('positioning_keys', set()):
+            elif key in positioning_keys:
                 value = configure_position(level=level, value=value)
                 tuple_entry = (key, value)
-            elif key in items.get('control_flow_keys', set()):
+            elif key in control_flow_keys:
                 value = modify_value(value_prompt, level=level, value=value,
                                      all_values=preset_values)
-                nested_answer = tidy_answer(['build', 'call'], level=level)
+                nested_answer = tidy_answer(NESTING_ANSWERS, level=level)
                 if nested_answer == 'build':
                     if isinstance(additional_value, str):
                         additional_value = None
@@ -548,10 +704,9 @@ def modify_tuple_list(tuple_list, level=0, prompts=None, items=None):
                         additional_value = None
 
                     additional_value = modify_value(
-                        prompts.get('preset_additional_value',
-                                    'preset additional value'),
-                        level=level, value=additional_value,
-                        all_values=items.get('preset_additional_values'))
+                        preset_additional_value_prompt, level=level,
+                        value=additional_value,
+                        all_values=preset_additional_values)
 
                 tuple_entry = (key, value, additional_value)
             else:
@@ -578,17 +733,25 @@ def modify_tuple_list(tuple_list, level=0, prompts=None, items=None):
 
 def get_strict_boolean(config, section, option):
     """Retrieve a strict boolean value from a configuration section."""
-    value = config.get(section, option)
-    if value.lower() not in {'true', 'false'}:
+    value = config.get(section, option).lower()
+    if value not in {'true', 'false'}:
         raise ValueError(f'Invalid boolean value for {option} in {section}.')
-    return config.getboolean(section, option)
+    return value == 'true'
 
 
 def evaluate_value(value):
     """Evaluate the given value using Python's abstract syntax trees."""
     evaluated_value = None
     try:
-        evaluated_value = ast.literal_eval(value)
+        if isinstance(value, str):
+            if value in NAMED_CONSTANTS:
+                evaluated_value = NAMED_CONSTANTS[value]
+            elif INTEGER_PATTERN.fullmatch(value):
+                evaluated_value = int(value)
+            elif value and not value.isidentifier():
+                evaluated_value = copy.deepcopy(parse_literal(value))
+        else:
+            evaluated_value = ast.literal_eval(value)
     except (SyntaxError, ValueError):
         pass
     except (TypeError, MemoryError, RecursionError) as e:
@@ -597,37 +760,32 @@ def evaluate_value(value):
     return evaluated_value
 
 
+@functools.lru_cache(maxsize=256)
+def parse_literal(string):
+    """Parse a string as a Python literal and cache the result."""
+    return ast.literal_eval(string)
+
+
 def tidy_answer(answers, level=0):
     """Tidy up the answer based on user input and initialism."""
-    initialism = ''
-
-    previous_initialism = ''
-    for word_index, word in enumerate(answers):
-        for char_index, _ in enumerate(word):
-            if word[char_index].lower() not in initialism:
-                mnemonics = word[char_index]
-                initialism = initialism + mnemonics.lower()
+    mnemonic_answers = {}
+    highlighted_words = []
+    for word in answers:
+        for char_index, char in enumerate(word):
+            if char.lower() not in mnemonic_answers:
+                mnemonic_answers[char.lower()] = word
+                highlighted_words.append(
+                    f'{word[:char_index]}{ANSI_UNDERLINE}{char}{ANSI_RESET}'
+                    f'{word[char_index + 1:]}')
                 break
-        if initialism == previous_initialism:
+        else:
             print('Undetermined mnemonics.')
             sys.exit(1)
-        else:
-            previous_initialism = initialism
-            highlighted_word = word.replace(
-                mnemonics, f'{ANSI_UNDERLINE}{mnemonics}{ANSI_RESET}', 1)
-            if word_index == 0:
-                prompt = highlighted_word
-            else:
-                prompt = f'{prompt}/{highlighted_word}'
 
-    answer = input(f'{INDENT * level}{prompt}: ').strip().lower()
+    answer = input(
+        f"{INDENT * level}{'/'.join(highlighted_words)}: ").strip().lower()
     if answer:
-        if answer[0] not in initialism:
-            answer = ''
-        else:
-            for index, _ in enumerate(initialism):
-                if initialism[index] == answer[0]:
-                    answer = answers[index]
+        answer = mnemonic_answers.get(answer[0], '')
     return answer
 
 
@@ -663,41 +821,105 @@ def modify_value(prompt, level=0, value='', all_values=None, limits=()):
 
 def configure_position(level=0, value=''):
     """Configure the position based on user input or mouse click."""
-    if GUI_IMPORT_ERROR:
-        print(GUI_IMPORT_ERROR)
+    gui_import_error = import_gui_modules()
+    if gui_import_error:
+        print(gui_import_error)
+        return False
+    if sys.platform != 'win32':
+        print('Capturing a mouse click requires Windows.')
         return False
 
-    value = prompt_for_input(f'coordinates/{ANSI_UNDERLINE}c{ANSI_RESET}lick',
-                             level=level, value=value)
-    if value and value[0].lower() == 'c':
-        previous_key_state = win32api.GetKeyState(0x01)
-        coordinates = ''
-        print(
-            f'{INDENT * level}{ANSI_WARNING}waiting for click...{ANSI_RESET}')
-        while True:
-            key_state = win32api.GetKeyState(0x01)
-            if key_state != previous_key_state:
-                if key_state not in [0, 1]:
-                    coordinates = ', '.join(map(str, pyautogui.position()))
-                    print(f'{INDENT * level}coordinates: {coordinates}')
-                    break
-
-            time.sleep(0.001)
-        return coordinates
-
-    parts = value.split(',')
-    if len(parts) == 2:
-        x = parts[0].strip()
-        y = parts[1].strip()
-        if x.isdigit() and y.isdigit():
-            return f'{x}, {y}'
+    while True:
+        value = prompt_for_input(
+            f'coordinates/{ANSI_UNDERLINE}c{ANSI_RESET}lick', level=level,
+            value=value)
+        if value and value[0].lower() == 'c':
+            print(f'{INDENT * level}{ANSI_WARNING}waiting for click...'
+                  f'{ANSI_RESET}')
+            wait_for_click()
+            coordinates = ', '.join(map(str, pyautogui.position()))
+            print(f'{INDENT * level}coordinates: {coordinates}')
+            return coordinates
+
+        parts = value.split(',')
+        if len(parts) == 2:
+            x = parts[0].strip()
+            y = parts[1].strip()
+            if x.isdigit() and y.isdigit():
+                return f'{x}, {y}'
+
+        value = f'{ANSI_RESET}{ANSI_ERROR}{value}'
+
+
+def wait_for_click():
+    """Block until the left mouse button is pressed."""
+    from ctypes import wintypes
+    import ctypes
+
+    wh_mouse_ll = 14
+    wm_lbuttondown = 0x0201
+    pm_remove = 0x0001
+    qs_allinput = 0x04FF
+    timeout = 100
+    lresult = ctypes.c_ssize_t
+    hookproc = ctypes.WINFUNCTYPE(lresult, ctypes.c_int, wintypes.WPARAM,
+                                  wintypes.LPARAM)
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.GetModuleHandleW.argtypes = (wintypes.LPCWSTR,)
+    kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+    user32 = ctypes.WinDLL('user32', use_last_error=True)
+    user32.SetWindowsHookExW.argtypes = (ctypes.c_int, hookproc,
+                                         wintypes.HINSTANCE, wintypes.DWORD)
+    user32.SetWindowsHookExW.restype = wintypes.HHOOK
+    user32.CallNextHookEx.argtypes = (wintypes.HHOOK, ctypes.c_int,
+                                      wintypes.WPARAM, wintypes.LPARAM)
+    user32.CallNextHookEx.restype = lresult
+    user32.UnhookWindowsHookEx.argtypes = (wintypes.HHOOK,)
+    user32.MsgWaitForMultipleObjects.argtypes = (
+        wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL,
+        wintypes.DWORD, wintypes.DWORD)
+    user32.MsgWaitForMultipleObjects.restype = wintypes.DWORD
+    user32.PeekMessageW.argtypes = (ctypes.POINTER(wintypes.MSG),
+                                    wintypes.HWND, wintypes.UINT,
+                                    wintypes.UINT, wintypes.UINT)
+
+    is_clicked = False
+
+    def hook_procedure(code, message, parameter):
+        """Record a press of the left mouse button."""
+        nonlocal is_clicked
+        try:
+            if code >= 0 and message == wm_lbuttondown:
+                is_clicked = True
+        finally:
+            result = user32.CallNextHookEx(None, code, message, parameter)
+        return result
+
+    procedure = hookproc(hook_procedure)
+    hook = user32.SetWindowsHookExW(wh_mouse_ll, procedure,
+                                    kernel32.GetModuleHandleW(None), 0)
+    if not hook:
+        raise ctypes.WinError(ctypes.get_last_error())
 
-    return configure_position(level=level,
-                              value=f'{ANSI_RESET}{ANSI_ERROR}{value}')
+    try:
+        message = wintypes.MSG()
+        while not is_clicked:
+            # Return to Python periodically so that Ctrl+C is handled.
+            user32.MsgWaitForMultipleObjects(0, None, False, timeout,
+                                             qs_allinput)
+            while user32.PeekMessageW(ctypes.byref(message), None, 0, 0,
+                                      pm_remove):
+                pass
+    finally:
+        user32.UnhookWindowsHookEx(hook)
 
 
 def prompt_for_input(prompt, level=0, value='', all_values=None):
     """Prompt the user for input and return the entered value."""
+    can_hint = bool(all_values) and len(all_values) <= MAXIMUM_HINTED_VALUES
+    if can_hint:
+        prompt = f"{prompt} [{'/'.join(map(str, all_values))}]"
     if value:
         prompt_prefix = (f'{INDENT * level}{prompt} '
                          f'{ANSI_CURRENT}{value}{ANSI_RESET}: ')
@@ -705,14 +927,14 @@ def prompt_for_input(prompt, level=0, value='', all_values=None):
         prompt_prefix = f'{INDENT * level}{prompt}: '
 
     completer = None
-    if all_values:
+    if all_values and not can_hint:
         completer = CustomWordCompleter(all_values, ignore_case=True)
-    elif value:
+    elif value and not all_values:
         completer = CustomWordCompleter([value], ignore_case=True)
 
     if completer:
         value = (pt_prompt(ANSI(prompt_prefix), completer=completer).strip()
                  or value)
     else:
-        value = input(prompt_prefix).strip()
+        value = input(prompt_prefix).strip() or value
     return value
@@ -3,8 +3,10 @@
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from io import StringIO
+from zoneinfo import ZoneInfo
 import argparse
 import configparser
+import functools
 import inspect
 import json
 import os
@@ -14,16 +16,12 @@ import sys
 from lxml import html
 from lxml.etree import Element
 import chardet
-import pandas as pd
-import pytz
 import requests
 
-import browser_driver
 import configuration
 import data_utilities
 import datetime_utilities
 import file_utilities
-import google_services
 import initializer
 import process_utilities
 import web_utilities
@@ -43,7 +41,13 @@ class Trade(initializer.Initializer):
         self.daily_sales_order_quota_section = (
             f'{self.vendor} Daily Sales Order Quota')
         self.order_status_section = f'{self.vendor} Order Status'
-        self.instruction_items = {
+
+    @functools.cached_property
+    def instruction_items(self):
+        """Return the instruction items for the browser actions."""
+        import browser_driver
+
+        return {
             'all_keys': initializer.extract_commands(
                 inspect.getsource(browser_driver.execute_action)),
             'control_flow_keys': {'exist', 'for'},
@@ -70,6 +74,8 @@ def main():
     if args.m:
         insert_maintenance_schedules(trade, config)
     if any((args.s, args.S, args.q, args.o)):
+        import browser_driver
+
         driver = browser_driver.initialize(
             headless=config['General'].getboolean('headless'),
             user_data_directory=config['General']['user_data_directory'],
@@ -375,14 +381,15 @@ def configure(trade, can_interpolate=True, can_override=True):
 
         latest_modified_time = 0.0
         identifier = ''
-        for f in os.listdir(
-                config[trade.process]['application_data_directory']):
-            if re.fullmatch('[0-9a-z]{32}', f):
-                modified_time = os.path.getmtime(os.path.join(
-                    config[trade.process]['application_data_directory'], f))
-                if modified_time > latest_modified_time:
-                    latest_modified_time = modified_time
-                    identifier = f
+        identifier_pattern = re.compile('[0-9a-z]{32}')
+        with os.scandir(config[trade.process][
+                'application_data_directory']) as entries:
+            for entry in entries:
+                if identifier_pattern.fullmatch(entry.name):
+                    modified_time = entry.stat().st_mtime
+                    if modified_time > latest_modified_time:
+                        latest_modified_time = modified_time
+                        identifier = entry.name
         if identifier:
             config[trade.process]['watchlists'] = os.path.join(
                 config[trade.process]['application_data_directory'],
@@ -414,9 +421,11 @@ def configure_exit(args, trade):
             'A': (trade.actions_section, None,
                   {'key': 'command', 'value': 'argument',
                    'additional_value': 'additional argument',
-                   'end_of_list': 'end of commands'}, trade.instruction_items,
-                  None)}.items():
+                   'end_of_list': 'end of commands'}, None, None)}.items():
             if getattr(args, argument):
+                if argument == 'A':
+                    items = trade.instruction_items
+
                 configuration.modify_section(
                     config, section, trade.config_path,
                     backup_parameters=backup_parameters, option=option,
@@ -434,8 +443,10 @@ def configure_exit(args, trade):
 
 def insert_maintenance_schedules(trade, config):
     """Insert maintenance schedules into a Google Calendar."""
+    import google_services
+
     section = config[trade.maintenance_schedules_section]
-    tzinfo = pytz.timezone(section['timezone'])
+    tzinfo = ZoneInfo(section['timezone'])
     now = datetime.now(tzinfo)
 
     head = web_utilities.make_head_request(section['url'])
@@ -472,6 +483,9 @@ def insert_maintenance_schedules(trade, config):
         section['calendar_id'], trade.maintenance_schedules_section,
         section['timezone'])
 
+    range_splitter_pattern = re.compile(section['range_splitter_regex'])
+    datetime_pattern = re.compile(section['datetime_regex'])
+    time_pattern = re.compile(r'\d{1,2}:\d{2}')
     previous_bodies = configuration.evaluate_value(section['previous_bodies'])
     for service in configuration.evaluate_value(section['services']):
         for schedule in root.xpath(section['service_xpath'].format(service)):
@@ -481,34 +495,33 @@ def insert_maintenance_schedules(trade, config):
                 section['datetime_xpath'])[0].text_content().split('\n')
 
             for index, _ in enumerate(datetimes):
-                datetime_range = re.split(
-                    re.compile(section['range_splitter_regex']),
+                datetime_range = range_splitter_pattern.split(
                     datetimes[index].strip())
 
                 if len(datetime_range) != 2:
                     continue
 
-                datetime_string = re.sub(
-                    section['datetime_regex'],
+                datetime_string = datetime_pattern.sub(
                     lambda match_object: replace_datetime(
                         match_object, section, now, tzinfo),
                     datetime_range[0])
-                start = tzinfo.localize(datetime.strptime(
+                start = datetime.strptime(
                     datetime_utilities.normalize_datetime_string(
-                        datetime_string), '%Y-%m-%d %H:%M'))
-                if re.fullmatch(r'\d{1,2}:\d{2}', datetime_range[1]):
+                        datetime_string),
+                    '%Y-%m-%d %H:%M').replace(tzinfo=tzinfo)
+                if time_pattern.fullmatch(datetime_range[1]):
                     datetime_string = (start.strftime('%Y-%m-%d ')
                                        + datetime_range[1])
                 else:
-                    datetime_string = re.sub(
-                        section['datetime_regex'],
+                    datetime_string = datetime_pattern.sub(
                         lambda match_object: replace_datetime(
                             match_object, section, now, tzinfo),
                         datetime_range[1])
 
-                end = tzinfo.localize(datetime.strptime(
+                end = datetime.strptime(
                     datetime_utilities.normalize_datetime_string(
-                        datetime_string), '%Y-%m-%d %H:%M'))
+                        datetime_string),
+                    '%Y-%m-%d %H:%M').replace(tzinfo=tzinfo)
 
                 body = {'summary': f'🛠️ {service}: {function}',
                         'start': {'dateTime': start.isoformat()},
@@ -544,9 +557,9 @@ def replace_datetime(match_object, section, now, tzinfo):
         return f'{matched_year}-{matched_month}-{matched_day} {matched_time}'
 
     assumed_year = int(now.strftime('%Y'))
-    timedelta_object = tzinfo.localize(datetime.strptime(
+    timedelta_object = datetime.strptime(
         f'{assumed_year}-{matched_month}-{matched_day} {matched_time}',
-        '%Y-%m-%d %H:%M')) - now
+        '%Y-%m-%d %H:%M').replace(tzinfo=tzinfo) - now
     threshold = timedelta(days=365 - 30)
     if timedelta_object < -threshold:
         assumed_year = assumed_year + 1
@@ -557,8 +570,17 @@ def replace_datetime(match_object, section, now, tzinfo):
 
 def check_daily_sales_order_quota(trade, config, driver):
     """Check the daily sales order quota and send an email if necessary."""
-    with open(config[trade.process]['watchlists'], encoding='utf-8') as f:
-        watchlists = json.load(f)
+    import browser_driver
+    import google_services
+
+    try:
+        import orjson
+    except ModuleNotFoundError:
+        with open(config[trade.process]['watchlists'], encoding='utf-8') as f:
+            watchlists = json.load(f)
+    else:
+        with open(config[trade.process]['watchlists'], 'rb') as f:
+            watchlists = orjson.loads(f.read())
 
     quota_watchlist = next(
         (watchlist for watchlist in watchlists['list']
@@ -578,11 +600,10 @@ def check_daily_sales_order_quota(trade, config, driver):
         driver, config[trade.actions_section]['get_daily_sales_order_quota'],
         text=text)
 
-    status = ''
-    for index, _ in enumerate(text):
-        if (not config[trade.daily_sales_order_quota_section]['sufficient']
-            in text[index]):
-            status += f'{securities_codes[index]}: {text[index]}\n'
+    sufficient = config[trade.daily_sales_order_quota_section]['sufficient']
+    status = ''.join(f'{securities_code}: {quota}\n'
+                     for securities_code, quota in zip(securities_codes, text)
+                     if sufficient not in quota)
 
     print(status)
 
@@ -596,6 +617,8 @@ def check_daily_sales_order_quota(trade, config, driver):
 
 def check_web_page_send_email_message(trade, config, section):
     """Check the web page and send an email message if an update is found."""
+    import google_services
+
     response = requests.get(config[section]['url'], timeout=5)
     response.encoding = chardet.detect(response.content)['encoding']
     root = html.fromstring(response.text)
@@ -619,97 +642,106 @@ def check_web_page_send_email_message(trade, config, section):
 
 def extract_order_status(trade, config, driver): # TODO: Make configurable.
     """Extract order status from a webpage and copy it to the clipboard."""
+    import numpy as np
+    import pandas as pd
+
     section = config[trade.order_status_section]
 
+    tables = [
+        table for table in html.fromstring(driver.page_source).xpath(
+            '//table[.//text()[re:test(., $pattern)]]',
+            namespaces={'re': 'http://exslt.org/regular-expressions'},
+            pattern=section['table_identifier'])
+        if ('display:none' not in table.get('style', '').replace(' ', '')
+            and table.xpath('.//tr'))]
+    if len(tables) < 2:
+        print('No tables found matching pattern',
+              repr(section['table_identifier']))
+        sys.exit(1)
+
     try:
-        dfs = pd.read_html(StringIO(driver.page_source),
-                           match=section['table_identifier'], flavor='lxml')
+        df = pd.read_html(StringIO(html.tostring(tables[1], encoding='unicode',
+                                                 with_tail=False)),
+                          flavor='lxml')[0]
     except ValueError as e:
         print(e)
         sys.exit(1)
 
     index = 0
-    df = dfs[1]
-    size_price = pd.DataFrame(columns=('size', 'price'))
-    size_column = int(section['size_column'])
-    price_column = int(section['price_column'])
-    execution_column = int(section['execution_column'])
-    datetime_column = int(section['datetime_column'])
+    sizes = []
+    prices = []
+    size_values = df.iloc[:, int(section['size_column'])].to_numpy()
+    price_values = df.iloc[:, int(section['price_column'])].to_numpy()
+    execution_values = df.iloc[:, int(section['execution_column'])].to_numpy()
+    datetime_values = df.iloc[:, int(section['datetime_column'])].to_numpy()
     output_columns = configuration.evaluate_value(section['output_columns'])
-    results = pd.DataFrame(columns=output_columns)
-    while index < len(df):
-        if df.iloc[index, execution_column] == section['execution']:
-            if len(size_price) == 0:
-                size_price.loc[0] = [df.iloc[index - 1, size_column],
-                                     df.iloc[index - 1, price_column]]
-
-            size_price.loc[len(size_price)] = [df.iloc[index, size_column],
-                                               df.iloc[index, price_column]]
-            if (index + 1 == len(df) or df.iloc[index + 1, execution_column]
-                != section['execution']):
-                size_price_index = 0
-                size_price = size_price.astype(float)
-                summation = 0
-                while size_price_index < len(size_price):
-                    summation += (size_price.loc[size_price_index, 'size']
-                                  * size_price.loc[size_price_index, 'price'])
-                    size_price_index += 1
-
-                average_price = summation / size_price['size'].sum()
+    exit_price_index = (output_columns.index('exit_price')
+                        if 'exit_price' in output_columns else None)
+    active_columns = [(i, column) for i, column in enumerate(output_columns)
+                      if column and column != 'None']
+    symbol_pattern = re.compile(section['symbol_regex'])
+    datetime_pattern = re.compile(section['datetime_regex'])
+    rows = []
+    order = {'trade_style': 'day'} # TODO: Make configurable.
+    while index < len(execution_values):
+        if execution_values[index] == section['execution']:
+            if not sizes:
+                sizes.append(size_values[index - 1])
+                prices.append(price_values[index - 1])
+
+            sizes.append(size_values[index])
+            prices.append(price_values[index])
+            if (index + 1 == len(execution_values)
+                or execution_values[index + 1] != section['execution']):
+                size_array = np.asarray(sizes, dtype=np.float64)
+                price_array = np.asarray(prices, dtype=np.float64)
+                average_price = float(size_array @ price_array
+                                      / size_array.sum())
                 if (section['margin_trading']
-                    in df.iloc[index - len(size_price), execution_column]):
-                    entry_price = average_price
-                else:
-                    results.loc[len(results) - 1, 'exit_price'] = average_price
+                    in execution_values[index - len(sizes)]):
+                    order['entry_price'] = average_price
+                elif rows and exit_price_index is not None:
+                    rows[-1][exit_price_index] = average_price
 
-                size_price = pd.DataFrame(columns=('size', 'price'))
+                sizes = []
+                prices = []
 
             index += 1
         else:
-            symbol = re.sub(section['symbol_regex'],
-                            section['symbol_replacement'],
-                            df.iloc[index, execution_column])
-            size = df.iloc[index + 1, size_column]
-            trade_style = 'day' # TODO: Make configurable.
-            if (section['margin_trading']
-                in df.iloc[index + 1, execution_column]):
-                entry_date = re.sub(section['datetime_regex'],
-                                    section['date_replacement'],
-                                    df.iloc[index + 2, datetime_column])
-                entry_time = re.sub(section['datetime_regex'],
-                                    section['time_replacement'],
-                                    df.iloc[index + 2, datetime_column])
-                if (section['buying_on_margin']
-                    in df.iloc[index + 1, execution_column]):
-                    trade_type = 'long'
+            order['symbol'] = symbol_pattern.sub(
+                section['symbol_replacement'], execution_values[index])
+            order['size'] = size_values[index + 1]
+            if section['margin_trading'] in execution_values[index + 1]:
+                order['entry_date'] = datetime_pattern.sub(
+                    section['date_replacement'],
+                    datetime_values[index + 2])
+                order['entry_time'] = datetime_pattern.sub(
+                    section['time_replacement'],
+                    datetime_values[index + 2])
+                if section['buying_on_margin'] in execution_values[index + 1]:
+                    order['trade_type'] = 'long'
                 else:
-                    trade_type = 'short'
+                    order['trade_type'] = 'short'
 
-                entry_price = df.iloc[index + 2, price_column]
+                order['entry_price'] = price_values[index + 2]
             else:
-                exit_date = re.sub(section['datetime_regex'],
-                                   section['date_replacement'],
-                                   df.iloc[index + 2, datetime_column])
-                exit_time = re.sub(section['datetime_regex'],
-                                   section['time_replacement'],
-                                   df.iloc[index + 2, datetime_column])
-                exit_price = df.iloc[index + 2, price_column]
-
-                results.loc[len(results)] = [
-                    {'entry_date': entry_date,
-                     'entry_time': entry_time,
-                     'symbol': symbol,
-                     'size': size,
-                     'trade_type': trade_type,
-                     'trade_style': trade_style,
-                     'entry_price': entry_price,
-                     'exit_date': exit_date,
-                     'exit_time': exit_time,
-                     'exit_price': exit_price}.get(column)
-                    for column in output_columns]
+                order['exit_date'] = datetime_pattern.sub(
+                    section['date_replacement'],
+                    datetime_values[index + 2])
+                order['exit_time'] = datetime_pattern.sub(
+                    section['time_replacement'],
+                    datetime_values[index + 2])
+                order['exit_price'] = price_values[index + 2]
+
+                row = [None] * len(output_columns)
+                for i, column in active_columns:
+                    row[i] = order.get(column)
+
+                rows.append(row)
 
             index += 3
 
+    results = pd.DataFrame(rows, columns=output_columns)
     if len(results) == 1:
         results = results.reindex([0, 1])
 